@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Background server for the post-edit hook.
+Keeps the interpreter, compiled stub patterns and linter imports warm so each
+Write/Edit costs a Unix socket round trip instead of a fresh Python startup.
+Started on demand by post-edit-check.py and exits after a period of inactivity.
+
+Each request is handled in a child forked from the warm server, so it can
+take on the client's cwd and environment without affecting other requests,
+and a slow linter on one file doesn't hold up edits to another.
+"""
+
+import importlib.util
+import os
+import socket
+import sys
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: no daemon
+
+# Shut down after this long without a request
+IDLE_TIMEOUT_SECONDS = 600
+
+
+def load_module(file_name, module_name):
+    """Import a hook script from this directory as a module."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def preload_linters():
+    """Import heavy linter modules up front so requests don't pay for them."""
+    try:
+        import flake8.api.legacy  # noqa: F401
+    except ImportError:
+        pass
+
+
+def prepare_socket_dir(client, socket_dir):
+    """Create the socket directory private to this user. Returns False if it can't be made private."""
+    try:
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        if not client.is_private_dir(socket_dir) and os.lstat(socket_dir).st_uid == os.getuid():
+            os.chmod(socket_dir, 0o700)  # Ours, but created with a looser mode
+    except OSError:
+        return False
+    return client.is_private_dir(socket_dir)
+
+
+def lock_socket_path(socket_path):
+    """
+    Exclusively lock the sidecar lock file for socket_path; the lock is
+    released when the returned file is closed. Daemons started by parallel
+    edits take it around bind and unlink, so one can't remove the other's
+    socket between its bind and listen.
+    """
+    lock_file = open(socket_path + '.lock', 'a')
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
+
+def bind_socket(socket_path):
+    """
+    Bind the listening socket. Returns (socket, inode of the bound path), or
+    None if another daemon already owns it.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # Only the current user may connect
+    try:
+        with lock_socket_path(socket_path):
+            try:
+                sock.bind(socket_path)
+            except OSError:
+                # Either a live daemon holds the socket or a dead one left it behind
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(socket_path)
+                    probe.close()
+                    sock.close()
+                    return None
+                except OSError:
+                    probe.close()
+                os.unlink(socket_path)
+                sock.bind(socket_path)
+            sock.listen(16)
+            inode = os.stat(socket_path).st_ino
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(old_umask)
+    return sock, inode
+
+
+def remove_socket(socket_path, inode):
+    """Unlink socket_path, unless it has since been replaced by another daemon's socket."""
+    try:
+        with lock_socket_path(socket_path):
+            if os.stat(socket_path).st_ino == inode:
+                os.unlink(socket_path)
+    except OSError:
+        pass
+
+
+def read_request(conn):
+    """Read a request until the client shuts down its write side."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def apply_request_header(header):
+    """Switch to the client's cwd and environment (see encode_request_header in post-edit-check.py)."""
+    cwd, *entries = header.split(b'\0')
+    env = {}
+    for entry in entries:
+        key, sep, value = entry.partition(b'=')
+        if key and sep:
+            env[os.fsdecode(key)] = os.fsdecode(value)
+    os.environ.clear()
+    os.environ.update(env)
+    os.chdir(os.fsdecode(cwd))
+
+
+def handle_request(conn, checks):
+    """Run the checks for one client and write back the response."""
+    data = read_request(conn)
+    header, _, payload = data.partition(b'\0\0')
+
+    response = None
+    try:
+        apply_request_header(header)
+        response = checks.main_body(checks.json_loads(payload))
+    except Exception:
+        pass  # Any failure degrades to "no output", same as the in-process hook
+
+    if response:
+        conn.sendall(response.encode('utf-8'))
+
+
+def serve_in_child(sock, conn, checks, timeout):
+    """Forked child: handle one connection, then exit without running the server's cleanup."""
+    try:
+        sock.close()
+        conn.settimeout(timeout)
+        handle_request(conn, checks)
+    except BaseException:
+        pass  # Client went away, or the checks failed
+    finally:
+        os._exit(0)
+
+
+def reap_children():
+    """Collect finished request children so they don't linger as zombies."""
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def serve(sock, client, checks):
+    """Accept requests until idle for IDLE_TIMEOUT_SECONDS, forking a child for each."""
+    sock.settimeout(IDLE_TIMEOUT_SECONDS)
+    while True:
+        try:
+            conn, _ = sock.accept()
+        except socket.timeout:
+            break
+        reap_children()
+        with conn:
+            try:
+                pid = os.fork()
+            except OSError:
+                continue  # Out of processes: drop the request, the client gets no output
+            if pid == 0:
+                serve_in_child(sock, conn, checks, client.DAEMON_TIMEOUT_SECONDS)
+
+
+def main():
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork') or fcntl is None:
+        sys.exit(0)
+
+    client = load_module('post-edit-check.py', 'post_edit_check')
+    checks = load_module('post-edit-lib.py', 'post_edit_lib')
+    preload_linters()
+
+    socket_path = client.get_daemon_socket_path()
+    if not prepare_socket_dir(client, os.path.dirname(socket_path)):
+        sys.exit(0)
+    try:
+        bound = bind_socket(socket_path)
+    except OSError:
+        sys.exit(0)
+    if bound is None:
+        sys.exit(0)
+    sock, inode = bound
+
+    try:
+        serve(sock, client, checks)
+    finally:
+        sock.close()
+        remove_socket(socket_path, inode)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ use crate::db::Database;
 const SETTINGS_JSON: &str = include_str!("../../../.claude/settings.json");
 const PROMPT_GUARD_PY: &str = include_str!("../../../.claude/hooks/prompt-guard.py");
 const POST_EDIT_CHECK_PY: &str = include_str!("../../../.claude/hooks/post-edit-check.py");
+const POST_EDIT_CHECKD_PY: &str = include_str!("../../../.claude/hooks/post-edit-checkd.py");
+const POST_EDIT_LIB_PY: &str = include_str!("../../../.claude/hooks/post-edit-lib.py");
 const SESSION_START_PY: &str = include_str!("../../../.claude/hooks/session-start.py");
 const PRE_WEB_CHECK_PY: &str = include_str!("../../../.claude/hooks/pre-web-check.py");
 const WORK_CHECK_PY: &str = include_str!("../../../.claude/hooks/work-check.py");
@@ -132,6 +134,12 @@ pub fn run(path: &Path, force: bool) -> Result<()> {
         fs::write(hooks_dir.join("post-edit-check.py"), POST_EDIT_CHECK_PY)
             .context("Failed to write post-edit-check.py")?;
 
+        fs::write(hooks_dir.join("post-edit-checkd.py"), POST_EDIT_CHECKD_PY)
+            .context("Failed to write post-edit-checkd.py")?;
+
+        fs::write(hooks_dir.join("post-edit-lib.py"), POST_EDIT_LIB_PY)
+            .context("Failed to write post-edit-lib.py")?;
+
         fs::write(hooks_dir.join("session-start.py"), SESSION_START_PY)
             .context("Failed to write session-start.py")?;
 
@@ -194,6 +202,8 @@ mod tests {
         assert!(dir.path().join(".claude/settings.json").exists());
         assert!(dir.path().join(".claude/hooks/prompt-guard.py").exists());
         assert!(dir.path().join(".claude/hooks/post-edit-check.py").exists());
+        assert!(dir.path().join(".claude/hooks/post-edit-checkd.py").exists());
+        assert!(dir.path().join(".claude/hooks/post-edit-lib.py").exists());
         assert!(dir.path().join(".claude/hooks/session-start.py").exists());
         assert!(dir.path().join(".claude/hooks/pre-web-check.py").exists());
         assert!(dir.path().join(".claude/hooks/work-check.py").exists());
@@ -342,6 +352,8 @@ mod tests {
         assert!(!SETTINGS_JSON.is_empty());
         assert!(!PROMPT_GUARD_PY.is_empty());
         assert!(!POST_EDIT_CHECK_PY.is_empty());
+        assert!(!POST_EDIT_CHECKD_PY.is_empty());
+        assert!(!POST_EDIT_LIB_PY.is_empty());
         assert!(!SESSION_START_PY.is_empty());
         assert!(!PRE_WEB_CHECK_PY.is_empty());
         assert!(!WORK_CHECK_PY.is_empty());